@@ -1,109 +1,126 @@
 # agents/info_extractor.py
 import ollama
-from ollama import AsyncClient
-import json
+import orjson
 import logging
 import os
 import asyncio
-from typing import Dict, Any, List
+import bisect
+import functools
+import itertools
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 from utils.retry_handler import RetryHandler
+from utils.ollama_client import LLM_SEMAPHORE, get_async_client, run_and_close
 
 logger = logging.getLogger(__name__)
 
+# Read-only default for missing metadata sections, avoids allocating a new {} per lookup
+_EMPTY = MappingProxyType({})
+
+# Ollama model used for extraction unless the caller picks another
+DEFAULT_MODEL = "gemma3:12b-8k"
+
+# Maximum transcript characters passed on to the prompt
+TRANSCRIPT_CHAR_LIMIT = 16000
+
+# Upper bounds (transcript chars) of the length bins extract_many submits as
+# separate waves, so short prompts are not held back by long ones in the same
+# server batch. The prompt carries at most a 4000-char excerpt, so anything
+# longer lands in the last bin.
+_LENGTH_BINS = (1000, 2500)
+
+# Fixed instructions are sent first as the system message so every request
+# shares the same prompt prefix and the server can reuse its cached prefix
+STATIC_INSTRUCTIONS = """Extract all software tools and keywords from the YouTube video provided by the user.
+
+Format response as JSON:
+{
+  "software": [
+    { "name": "Software Name", "description": "Brief description", "mentions": count }
+  ],
+  "keywords": ["keyword1", "keyword2", "keyword3"]
+}
+
+For software: include ALL software products, platforms, and digital tools mentioned
+For keywords: focus on technical terms not already in the video's existing tags
+"""
+
+class BadFormatError(ValueError):
+    """LLM reply that could not be parsed as JSON; keeps the raw content"""
+    def __init__(self, message: str, content: str):
+        super().__init__(message)
+        self.content = content
+
 async def extract_info(
-    transcript: List[Dict[str, Any]],
-    video_metadata: Dict[str, Any]
+    transcript: Iterable[Dict[str, Any]],
+    video_metadata: Dict[str, Any],
+    *,
+    model: str = DEFAULT_MODEL
 ) -> Dict[str, Any]:
-    """Extract software mentions and tags from video content"""
+    """Extract software mentions and tags from video content
+
+    The transcript is consumed once and only until the character limit is
+    reached, so a lazy iterator of segments can be passed instead of a list.
+    """
     # Prepare transcript text
-    transcript_text = " ".join([item.get("text", "") for item in transcript])
-    if len(transcript_text) > 16000:
-        transcript_text = transcript_text[:16000] + "..."
+    transcript_text = _join_transcript(transcript)
     
     # Extract existing video data
-    video_data = video_metadata.get('video', {})
+    video_data = video_metadata.get('video') or _EMPTY
     existing_tags = video_data.get('tags', [])
     
-    # Prompt for LLM
-    prompt = f"""Extract all software tools and keywords from this YouTube video:
-
-Video: {video_data.get('title', '')}
+    # Video-specific data only; the fixed instructions are sent as the system prompt
+    prompt = f"""Video: {video_data.get('title', '')}
 Description excerpt: {video_data.get('description', '')[:300]}...
 
 Transcript excerpt:
 {transcript_text[:4000]}...
 
-Format response as JSON:
-```json
-{{
-  "software": [
-    {{ "name": "Software Name", "description": "Brief description", "mentions": count }}
-  ],
-  "keywords": ["keyword1", "keyword2", "keyword3"]
-}}
-```
-
-For software: include ALL software products, platforms, and digital tools mentioned
-For keywords: focus on technical terms not already in: {existing_tags}
+Existing tags: {existing_tags}
 """
 
     try:
-        # Call LLM with gemma model using retry handler
-        result, error = await RetryHandler.retry_async(
-            _call_llm,
+        # Call LLM using retry handler; malformed JSON replies are retried
+        # too since a fresh sample is often well formed
+        last_exception: Optional[Exception] = None
+        
+        async def attempt() -> Dict[str, Any]:
+            nonlocal last_exception
+            try:
+                return await _request_extraction(prompt, model)
+            except Exception as e:
+                last_exception = e
+                raise
+        
+        extracted_data, error = await RetryHandler.retry_async(
+            attempt,
             max_retries=2,
-            phase_name="info_extraction",
-            prompt=prompt
+            phase_name="info_extraction"
         )
         
         if error:
             logger.error(f"Failed to extract info after retries: {error.message}")
+            if isinstance(last_exception, BadFormatError):
+                # Last attempt got a reply that was not valid JSON; try to
+                # extract keywords from it
+                return {
+                    "software": [],
+                    "tags": _merge_tags(existing_tags, _salvage_keywords(last_exception.content)),
+                    "error": f"JSON parsing error: {error.message}"
+                }
             return {
                 "software": [],
                 "tags": existing_tags,
                 "error": error.message
             }
         
-        # Extract and parse content
-        content = result["message"]["content"]
-        logger.info(f"Received response from LLM, content length: {len(content)}")
+        # Combine tags
+        all_tags = _merge_tags(existing_tags, extracted_data.get("keywords", []))
         
-        try:
-            if "```json" in content:
-                json_str = content.split("```json", 1)[1].split("```", 1)[0].strip()
-                extracted_data = json.loads(json_str)
-            else:
-                extracted_data = json.loads(content)
-                
-            # Combine tags
-            all_tags = existing_tags.copy()
-            for tag in extracted_data.get("keywords", []):
-                if tag not in all_tags:
-                    all_tags.append(tag)
-            
-            return {
-                "software": extracted_data.get("software", []),
-                "tags": all_tags
-            }
-        except json.JSONDecodeError as je:
-            logger.error(f"JSON decode error: {je}, content: {content[:200]}...")
-            
-            # Try to extract keywords even if JSON parsing fails
-            keywords = []
-            try:
-                for line in content.split('\n'):
-                    if '**' in line:
-                        possible_keyword = line.split('**')[1].strip() if '**' in line else ''
-                        if possible_keyword and len(possible_keyword) > 2:
-                            keywords.append(possible_keyword)
-            except Exception:
-                pass
-                
-            return {
-                "software": [],
-                "tags": list(set(existing_tags + keywords)),
-                "error": f"JSON parsing error: {str(je)}"
-            }
+        return {
+            "software": extracted_data.get("software", []),
+            "tags": all_tags
+        }
         
     except Exception as e:
         logger.error(f"Error during info extraction: {e}")
@@ -113,26 +130,140 @@ For keywords: focus on technical terms not already in: {existing_tags}
             "error": str(e)
         }
 
-async def _call_llm(prompt: str) -> Dict[str, Any]:
+async def _request_extraction(prompt: str, model: str) -> Dict[str, Any]:
+    """Call the LLM and parse its JSON reply
+
+    Raises BadFormatError on a malformed reply so the retry handler asks for
+    a new one.
+    """
+    response = await _call_llm(prompt, model)
+    content = response["message"]["content"]
+    logger.info(f"Received response from LLM, content length: {len(content)}")
+    
+    # format="json" makes Ollama return bare JSON, no code fence to strip
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError as je:
+        logger.error(f"JSON decode error: {je}, content: {content[:200]}...")
+        raise BadFormatError(str(je), content) from je
+
+def _salvage_keywords(content: str) -> List[str]:
+    """Pick **bold** terms out of a reply that could not be parsed as JSON"""
+    keywords = []
+    for line in content.split('\n'):
+        if '**' in line:
+            possible_keyword = line.split('**')[1].strip()
+            if possible_keyword and len(possible_keyword) > 2:
+                keywords.append(possible_keyword)
+    return keywords
+
+def _join_transcript(transcript: Iterable[Dict[str, Any]], limit: int = TRANSCRIPT_CHAR_LIMIT) -> str:
+    """Join transcript segment texts, stopping as soon as the limit is exceeded"""
+    parts = []
+    total = -1  # no separator before the first segment
+    for item in transcript:
+        text = item.get("text", "")
+        parts.append(text)
+        total += len(text) + 1
+        if total > limit:
+            return " ".join(parts)[:limit] + "..."
+    return " ".join(parts)
+
+def _merge_tags(existing_tags: List[str], new_tags: List[str]) -> List[str]:
+    """Append new tags not already present, preserving order
+
+    Only string tags are merged; the model sometimes returns objects or lists
+    in place of keywords, which are skipped rather than failing the merge.
+    """
+    new_tags = (tag for tag in new_tags or () if isinstance(tag, str))
+    return list(dict.fromkeys(itertools.chain(existing_tags, new_tags)))
+
+def _binned_length(transcript: Sequence[Dict[str, Any]]) -> int:
+    """Sum segment text lengths, stopping once past the last bin bound"""
+    total = 0
+    for item in transcript:
+        total += len(item.get("text", ""))
+        if total > _LENGTH_BINS[-1]:
+            break
+    return total
+
+async def extract_many(
+    video_specs: List[Tuple[Sequence[Dict[str, Any]], Dict[str, Any]]],
+    *,
+    model: str = DEFAULT_MODEL
+) -> List[Dict[str, Any]]:
+    """Extract info for several videos concurrently
+
+    Each spec is a (transcript, video_metadata) pair. Transcripts must be
+    sequences rather than one-shot iterators, since they are read once to pick
+    a length bin and again by extract_info. Videos are grouped by transcript
+    length and each group is run as one concurrent wave. Results
+    are returned in the same order as the specs; a failed extraction is
+    returned as an error result.
+    """
+    bins = [[] for _ in range(len(_LENGTH_BINS) + 1)]
+    for index, (transcript, _) in enumerate(video_specs):
+        bins[bisect.bisect_left(_LENGTH_BINS, _binned_length(transcript))].append(index)
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(video_specs)
+    for indices in bins:
+        if not indices:
+            continue
+        wave = await asyncio.gather(
+            *(extract_info(*video_specs[index], model=model) for index in indices),
+            return_exceptions=True
+        )
+        for index, result in zip(indices, wave):
+            if isinstance(result, BaseException):
+                result = {"software": [], "tags": [], "error": str(result)}
+            results[index] = result
+    return results
+
+async def warmup() -> None:
+    """Open the shared Ollama connection ahead of the first extraction
+
+    Meant to run concurrently with other startup I/O so the first chat
+    request reuses an established connection. Failures are ignored; the
+    real request will surface them.
+    """
+    try:
+        await get_async_client().list()
+    except Exception as e:
+        logger.debug(f"Ollama warmup failed: {e}")
+
+async def _call_llm(prompt: str, model: str = DEFAULT_MODEL) -> Dict[str, Any]:
     """Call Ollama LLM with the given prompt"""
-    client = AsyncClient()
-    response = await client.chat(
-        model="gemma3:12b-8k",
-        messages=[{"role": "user", "content": prompt}],
-        format="json",
-        options={"temperature": 0.1}
-    )
+    client = get_async_client()
+    async with LLM_SEMAPHORE:
+        response = await client.chat(
+            model=model,
+            messages=[
+                {"role": "system", "content": STATIC_INSTRUCTIONS},
+                {"role": "user", "content": prompt}
+            ],
+            format="json",
+            options={"temperature": 0.1}
+        )
     return response
 
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: str) -> str:
+    """Create a directory once per process"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _write_results(output_path: str, results: Dict[str, Any]) -> None:
+    """Serialize and write results; run in a worker thread"""
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+
 async def save_extraction_results(video_id: str, results: Dict[str, Any]) -> str:
     """Save extraction results to output folder"""
-    output_dir = os.path.join(os.getcwd(), "output")
-    os.makedirs(output_dir, exist_ok=True)
-    
+    output_dir = _ensure_dir(os.path.join(os.getcwd(), "output"))
     output_path = os.path.join(output_dir, f"{video_id}_extracted_info.json")
     
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    # Keep the event loop free for in-flight LLM requests while writing
+    await asyncio.to_thread(_write_results, output_path, results)
     
     logger.info(f"Results saved to {output_path}")
     return output_path
@@ -157,13 +288,14 @@ if __name__ == "__main__":
     video_id = sys.argv[1]
     metadata_path = sys.argv[2]
     
-    with open(metadata_path, 'r') as f:
-        data = json.load(f)
+    with open(metadata_path, 'rb') as f:
+        data = orjson.loads(f.read())
     
     transcript = data.get('transcript', [])
+    video_info = data.get('video_info') or _EMPTY
     video_metadata = {
-        'video': data.get('video_info', {}).get('video', {}),
-        'channel': data.get('video_info', {}).get('channel', {})
+        'video': video_info.get('video') or _EMPTY,
+        'channel': video_info.get('channel') or _EMPTY
     }
     
-    asyncio.run(run_extraction(video_id, transcript, video_metadata))
+    asyncio.run(run_and_close(run_extraction(video_id, transcript, video_metadata)))
@@ -11,7 +11,8 @@ Arguments:
 URL                 YouTube video URL
 
 Options:
---save, -s          Save output to file instead of just printing to console
+--save, -s          Save output to file instead of printing to console
+--print, -p         Print output to console even when saving to file
 --output, -o DIR    Specify output directory (default: 'output')
 --workflow, -w      Run the full analysis workflow
 --debug, -d         Enable debug output
@@ -20,12 +21,13 @@ Examples:
 python main.py https://www.youtube.com/watch?v=OFk8HvCr_pY
 python main.py https://www.youtube.com/watch?v=OFk8HvCr_pY --save
 python main.py https://www.youtube.com/watch?v=OFk8HvCr_pY -s -o custom_dir
+python main.py https://www.youtube.com/watch?v=OFk8HvCr_pY -s -p
 python main.py https://www.youtube.com/watch?v=OFk8HvCr_pY -w
 """
 
 import sys
-import json
 import os
+import orjson
 import argparse
 import asyncio
 import logging
@@ -34,29 +36,40 @@ import traceback
 # Import from the services directory
 from services.transcript_service import get_video_transcript_data, get_video_id_from_url
 from services.youtube_data_api import get_youtube_video_data
-from utils.state_manager import StateManager
-from workflow.graph import create_workflow, YTAnalysisState, ExtractInfoNode
+from workflow.graph import create_workflow, YTAnalysisState, ExtractInfoNode, get_state_manager
+from agents.info_extractor import warmup
+from utils.ollama_client import run_and_close
 from pydantic_graph import GraphRunContext
 
 def make_json_serializable(obj):
     """Convert non-serializable objects to serializable format."""
+    return _serialize(obj, {})
+
+def _serialize(obj, memo):
+    """Recursive worker for make_json_serializable; memo maps id() of already
+    converted containers to their result so shared subtrees are walked once."""
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    
+    oid = id(obj)
+    if oid in memo:
+        return memo[oid]
+    
     if hasattr(obj, 'to_dict') and callable(obj.to_dict):
-        return obj.to_dict()
+        result = obj.to_dict()
     elif hasattr(obj, '__dict__'):
-        return {k: make_json_serializable(v) for k, v in obj.__dict__.items() 
-                if not k.startswith('_')}
+        result = {k: _serialize(v, memo) for k, v in obj.__dict__.items() 
+                  if not k.startswith('_')}
     elif isinstance(obj, dict):
-        return {k: make_json_serializable(v) for k, v in obj.items()}
+        result = {k: _serialize(v, memo) for k, v in obj.items()}
     elif isinstance(obj, (list, tuple)):
-        return [make_json_serializable(item) for item in obj]
+        result = [_serialize(item, memo) for item in obj]
     else:
-        try:
-            # Test if it's JSON serializable
-            json.dumps(obj)
-            return obj
-        except (TypeError, OverflowError):
-            # If not serializable, convert to string
-            return str(obj)
+        # Anything else is not natively serializable, convert to string
+        return str(obj)
+    
+    memo[oid] = result
+    return result
 
 async def run_workflow_async(video_id, video_info, transcript_data):
     """Run the analysis workflow asynchronously"""
@@ -65,7 +78,7 @@ async def run_workflow_async(video_id, video_info, transcript_data):
     channel_id = video_info.get("channel", {}).get("id", "unknown")
     logging.info(f"Channel ID: {channel_id}")
     
-    state_manager = StateManager()
+    state_manager = get_state_manager()
     initial_state = YTAnalysisState(
         state=state_manager.initialize_state(channel_id, video_id),
         youtube_data={
@@ -85,11 +98,12 @@ async def run_workflow_async(video_id, video_info, transcript_data):
     logging.info("Workflow execution completed successfully")
     return result.value
 
-def main():
+async def main():
    # Set up argument parser
    parser = argparse.ArgumentParser(description='YouTube video analysis')
    parser.add_argument('url', help='YouTube video URL')
    parser.add_argument('--save', '-s', action='store_true', help='Save output to file')
+   parser.add_argument('--print', '-p', action='store_true', help='Print output even when saving to file')
    parser.add_argument('--output', '-o', default='output', help='Output directory')
    parser.add_argument('--workflow', '-w', action='store_true', help='Run the full analysis workflow')
    parser.add_argument('--debug', '-d', action='store_true', help='Enable debug output')
@@ -108,18 +122,21 @@ def main():
    
    logging.info(f"Processing video ID: {video_id}")
    
-   # Fetch transcript data
-   logging.info("Fetching transcript data...")
-   transcript_data = get_video_transcript_data(args.url)
+   # Fetch transcript and YouTube video/channel data concurrently
+   logging.info("Fetching transcript, video and channel data...")
+   fetches = [
+       asyncio.to_thread(get_video_transcript_data, args.url),
+       asyncio.to_thread(get_youtube_video_data, video_id, include_channel_videos=False)
+   ]
+   if args.workflow:
+       # Open the Ollama connection while the fetches are in flight
+       fetches.append(warmup())
+   transcript_data, video_info, *_ = await asyncio.gather(*fetches)
    if transcript_data:
        logging.info(f"Found transcript with {len(transcript_data.get('transcript', []))} segments")
    else:
        logging.warning("No transcript data found")
    
-   # Fetch YouTube video and channel data
-   logging.info("Fetching video and channel data...")
-   video_info = get_youtube_video_data(video_id, include_channel_videos=False)
-   
    # Combine the results
    result = {
        "video_id": video_id,
@@ -133,8 +150,7 @@ def main():
        try:
            logging.info("Starting workflow execution...")
            
-           # Use asyncio to run the async workflow
-           workflow_result = asyncio.run(run_workflow_async(video_id, video_info, transcript_data))
+           workflow_result = await run_workflow_async(video_id, video_info, transcript_data)
            
            result["workflow_output"] = workflow_result
            logging.info(f"Workflow completed successfully")
@@ -144,20 +160,29 @@ def main():
            if args.debug:
                traceback.print_exc()
    
-   # Make result JSON serializable
+   # Make result JSON serializable; transcript and video_info are already plain
+   # dicts and lists, only these entries can hold library objects
    logging.info("Preparing output...")
-   serializable_result = make_json_serializable(result)
+   for key in ("available_transcripts", "workflow_output"):
+       if key in result:
+           result[key] = make_json_serializable(result[key])
+   
+   output = orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
    
-   # Print to screen by default
-   print(json.dumps(serializable_result, indent=2))
+   # Print to screen unless saving to file (or explicitly requested)
+   if args.print or not args.save:
+       sys.stdout.flush()
+       sys.stdout.buffer.write(output)
+       sys.stdout.buffer.write(b"\n")
+       sys.stdout.buffer.flush()
    
    # Save to file if requested
    if args.save:
        os.makedirs(args.output, exist_ok=True)
        output_file = f"{args.output}/{video_id}.json"
-       with open(output_file, "w") as f:
-           json.dump(serializable_result, f, indent=2)
+       with open(output_file, "wb") as f:
+           f.write(output)
        logging.info(f"Data saved to {output_file}")
 
 if __name__ == "__main__":
-   main()
\ No newline at end of file
+   asyncio.run(run_and_close(main()))
\ No newline at end of file
@@ -3,9 +3,10 @@ import asyncio
 import json
 import logging
 import sys
-from agents.info_extractor import extract_info, save_extraction_results
+from agents.info_extractor import extract_info, save_extraction_results, warmup
 from services.transcript_service import get_video_transcript_data, get_video_id_from_url
 from services.youtube_data_api import get_youtube_video_data
+from utils.ollama_client import run_and_close
 
 logging.basicConfig(level=logging.DEBUG, 
                    format='%(asctime)s - %(levelname)s: %(message)s')
@@ -19,13 +20,14 @@ async def extract_video_info(video_url):
     
     logging.info(f"Processing video ID: {video_id}")
     
-    # Fetch transcript data
-    logging.info("Fetching transcript data...")
-    transcript_data = get_video_transcript_data(video_url)
-    
-    # Fetch YouTube video and channel data
-    logging.info("Fetching video and channel data...")
-    video_info = get_youtube_video_data(video_id, include_channel_videos=False)
+    # Fetch transcript and YouTube video/channel data concurrently, opening
+    # the Ollama connection at the same time
+    logging.info("Fetching transcript, video and channel data...")
+    transcript_data, video_info, _ = await asyncio.gather(
+        asyncio.to_thread(get_video_transcript_data, video_url),
+        asyncio.to_thread(get_youtube_video_data, video_id, include_channel_videos=False),
+        warmup()
+    )
     
     # Prepare metadata for extraction
     video_metadata = {
@@ -50,6 +52,6 @@ if __name__ == "__main__":
         video_url = "https://www.youtube.com/watch?v=eIJ6bSxD5so"
     
     print(f"Extracting info from: {video_url}")
-    results = asyncio.run(extract_video_info(video_url))
+    results = asyncio.run(run_and_close(extract_video_info(video_url)))
     print("\nExtraction results:")
     print(json.dumps(results, indent=2))
\ No newline at end of file
@@ -1,16 +1,16 @@
 # test_extraction.py
 import asyncio
-import json
+import orjson
 import logging
 from agents.info_extractor import extract_info, save_extraction_results
+from utils.ollama_client import run_and_close
 
 async def test_extraction(json_file):
-    logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
     
     logger.info(f"Loading test data from {json_file}")
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    with open(json_file, 'rb') as f:
+        data = orjson.loads(f.read())
     
     # Get video ID and data
     video_id = data.get('video_id', json_file.replace('.json', ''))
@@ -29,19 +29,21 @@ async def test_extraction(json_file):
     output_path = await save_extraction_results(video_id, results)
     
     # Log summary
-    software_count = len(results.get('software', []))
-    keywords_count = len(results.get('tags', []))
+    software = results.get('software', [])
+    tags = results.get('tags', [])
+    software_count = len(software)
+    keywords_count = len(tags)
     
     logger.info(f"Extraction complete! Found {software_count} software mentions and {keywords_count} keywords")
     
     if software_count > 0:
         logger.info("Software mentions:")
-        for i, software in enumerate(results.get('software', [])[:5]):  # Show first 5
-            logger.info(f"  {i+1}. {software.get('name')}: {software.get('description', 'No description')}")
+        for i, item in enumerate(software[:5]):  # Show first 5
+            logger.info(f"  {i+1}. {item.get('name')}: {item.get('description', 'No description')}")
     
     if keywords_count > 0:
         logger.info("Sample keywords:")
-        sample_keywords = results.get('tags', [])[-10:] if len(results.get('tags', [])) > 10 else results.get('tags', [])
+        sample_keywords = tags[-10:] if keywords_count > 10 else tags
         for keyword in sample_keywords:
             logger.info(f"  - {keyword}")
     
@@ -51,9 +53,11 @@ async def test_extraction(json_file):
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(level=logging.INFO)
+    
     if len(sys.argv) != 2:
         print("Usage: python test_extraction.py <json_file>")
         sys.exit(1)
         
     json_file = sys.argv[1]
-    asyncio.run(test_extraction(json_file))
\ No newline at end of file
+    asyncio.run(run_and_close(test_extraction(json_file)))
\ No newline at end of file
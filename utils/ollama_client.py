@@ -1,5 +1,9 @@
 import ollama
-from typing import Dict, Any, Optional, List, Union, Iterator
+from typing import Dict, Any, Optional, List, Union, Iterator, Awaitable, TypeVar
+import asyncio
+import httpx
+import os
+import random
 import time
 import logging
 import json
@@ -7,6 +11,58 @@ import re
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Connection pool settings shared by the sync and async clients; idle
+# keep-alive connections are reused instead of reconnecting per request
+_HTTP_TIMEOUT = httpx.Timeout(120.0)
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Caps in-flight async chat requests across all callers of the shared client;
+# keep in line with the server's OLLAMA_NUM_PARALLEL (and OLLAMA_MAX_LOADED_MODELS
+# if several models are used) so extra requests queue here instead of on the server
+LLM_SEMAPHORE = asyncio.Semaphore(int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+
+# Upper bound in seconds for a single retry wait
+_RETRY_CAP = 30.0
+
+# Shared clients so every request reuses pooled connections
+_CLIENT: Optional[ollama.Client] = None
+_ASYNC_CLIENT: Optional[ollama.AsyncClient] = None
+
+def _get_client() -> ollama.Client:
+    """Return the shared Ollama client, creating it on first use"""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ollama.Client(timeout=_HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+    return _CLIENT
+
+def get_async_client() -> ollama.AsyncClient:
+    """Return the shared async Ollama client, creating it on first use"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = ollama.AsyncClient(timeout=_HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+    return _ASYNC_CLIENT
+
+async def close_clients() -> None:
+    """Close the shared clients' connection pools; call before the event loop shuts down"""
+    global _CLIENT, _ASYNC_CLIENT
+    # ollama's clients have no close method of their own, so close the httpx
+    # clients they wrap
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT._client.aclose()
+        _ASYNC_CLIENT = None
+    if _CLIENT is not None:
+        _CLIENT._client.close()
+        _CLIENT = None
+
+async def run_and_close(coro: Awaitable[T]) -> T:
+    """Await coro, then close the shared clients; wrap asyncio.run entry points with it"""
+    try:
+        return await coro
+    finally:
+        await close_clients()
+
 class OllamaClient:
     def __init__(self, model: str, max_retries: int = 2, retry_delay: int = 5):
         self.model = model
@@ -17,6 +73,9 @@ class OllamaClient:
             "completion_tokens": 0,
             "total_tokens": 0
         }
+        # System message reused while the same system prompt keeps being passed
+        self._cached_system_text: Optional[str] = None
+        self._cached_system_msg: Optional[Dict[str, str]] = None
         
     def _reset_token_usage(self):
         """Reset token usage stats"""
@@ -33,6 +92,13 @@ class OllamaClient:
             self.token_usage["completion_tokens"] = response.get('eval_count', 0)
             self.token_usage["total_tokens"] = self.token_usage["prompt_tokens"] + self.token_usage["completion_tokens"]
         
+    def _add_token_usage(self, response: Dict[str, Any]):
+        """Add token usage from one response of a batch"""
+        if 'eval_count' in response:
+            self.token_usage["prompt_tokens"] += response.get('prompt_eval_count', 0)
+            self.token_usage["completion_tokens"] += response.get('eval_count', 0)
+            self.token_usage["total_tokens"] = self.token_usage["prompt_tokens"] + self.token_usage["completion_tokens"]
+        
     def get_token_usage(self) -> Dict[str, int]:
         """Get current token usage stats"""
         return self.token_usage.copy()
@@ -50,15 +116,11 @@ class OllamaClient:
         """Generate a response using Ollama with retry logic"""
         self._reset_token_usage()
         
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt)
         
         for attempt in range(self.max_retries + 1):
             try:
-                response = ollama.chat(
+                response = _get_client().chat(
                     model=self.model,
                     messages=messages,
                     options={
@@ -85,25 +147,25 @@ class OllamaClient:
                       prompt: str, 
                       system_prompt: Optional[str] = None,
                       temperature: float = 0.7,
-                      format: Optional[str] = None,
+                      format: Optional[str] = "json",
                       top_p: float = 0.9,
                       top_k: int = 40,
                       num_ctx: int = 4096,
                       num_predict: int = 128,
                       stop: Optional[Union[str, List[str]]] = None) -> Iterator[Dict[str, Any]]:
-        """Stream response generation from Ollama"""
-        self._reset_token_usage()
+        """Stream response generation from Ollama
         
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        Requests JSON output by default, like generate; pass format=None for
+        free-form text.
+        """
+        self._reset_token_usage()
         
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt)
         
         for attempt in range(self.max_retries + 1):
             try:
                 last_chunk = None
-                stream = ollama.chat(
+                stream = _get_client().chat(
                     model=self.model,
                     messages=messages,
                     stream=True,
@@ -132,6 +194,100 @@ class OllamaClient:
                     logger.error(f"All {self.max_retries+1} attempts failed with error: {str(e)}")
                     raise
 
+    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """Embed texts via /api/embed, sending batch_size inputs per request with retry logic"""
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = _get_client().embed(model=self.model, input=batch)
+                    embeddings.extend(response["embeddings"])
+                    break
+                except Exception as e:
+                    if attempt < self.max_retries:
+                        logger.warning(f"Attempt {attempt+1} failed with error: {str(e)}. Retrying in {self.retry_delay} seconds...")
+                        time.sleep(self.retry_delay)
+                    else:
+                        logger.error(f"All {self.max_retries+1} attempts failed with error: {str(e)}")
+                        raise
+        return embeddings
+    
+    async def generate_batch(self, 
+                           prompts: List[str], 
+                           system_prompt: Optional[str] = None,
+                           temperature: float = 0.7,
+                           format: str = "json",
+                           top_p: float = 0.9,
+                           top_k: int = 40,
+                           num_ctx: int = 4096,
+                           num_predict: int = 128,
+                           stop: Optional[Union[str, List[str]]] = None) -> List[Dict[str, Any]]:
+        """Generate responses for several prompts concurrently
+        
+        Requests are sent together so Ollama can batch them, up to the shared
+        LLM_SEMAPHORE limit (OLLAMA_NUM_PARALLEL); the rest wait client-side.
+        Token usage is summed over the batch. Responses are returned in prompt
+        order.
+        """
+        self._reset_token_usage()
+        
+        options = {
+            "temperature": temperature,
+            "top_p": top_p,
+            "top_k": top_k,
+            "num_ctx": num_ctx,
+            "num_predict": num_predict,
+            "stop": stop
+        }
+        
+        responses = await asyncio.gather(*[
+            self._chat_async(self._build_messages(prompt, system_prompt), options, format)
+            for prompt in prompts
+        ])
+        
+        for response in responses:
+            self._add_token_usage(response)
+        return responses
+    
+    def _build_messages(self, prompt: str, system_prompt: Optional[str]) -> List[Dict[str, str]]:
+        """Build the chat messages for a prompt"""
+        user_msg = {"role": "user", "content": prompt}
+        if not system_prompt:
+            return [user_msg]
+        
+        if system_prompt != self._cached_system_text:
+            self._cached_system_text = system_prompt
+            self._cached_system_msg = {"role": "system", "content": system_prompt}
+        return [self._cached_system_msg, user_msg]
+    
+    async def _chat_async(self, 
+                        messages: List[Dict[str, str]], 
+                        options: Dict[str, Any], 
+                        format: Optional[str]) -> Dict[str, Any]:
+        """Send one chat request through the shared async client with retry logic
+        
+        Waits use the same capped full-jitter backoff as RetryHandler so the
+        requests of a failed batch do not all retry at the same moment.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with LLM_SEMAPHORE:
+                    return await get_async_client().chat(
+                        model=self.model,
+                        messages=messages,
+                        options=options,
+                        format=format
+                    )
+            except Exception as e:
+                if attempt < self.max_retries:
+                    wait_time = random.uniform(0, min(_RETRY_CAP, self.retry_delay * (2 ** attempt)))
+                    logger.warning(f"Attempt {attempt+1} failed with error: {str(e)}. Retrying in {wait_time:.2f} seconds...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    logger.error(f"All {self.max_retries+1} attempts failed with error: {str(e)}")
+                    raise
+
     # [Rest of methods with token tracking added similar to above...]
     
     def log_performance(self, duration_ms: float, prompt_length: int):
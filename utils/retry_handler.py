@@ -1,4 +1,6 @@
 # utils/retry_handler.py
+import asyncio
+import random
 import time
 import logging
 from functools import wraps
@@ -19,10 +21,15 @@ class RetryHandler:
         delay: float = 1.0,
         backoff_factor: float = 2.0,
         phase_name: str = "unknown",
-        *args, **kwargs
+        *args,
+        cap: float = 30.0,
+        **kwargs
     ) -> tuple[Optional[T], Optional[Error]]:
         """
-        Retry an async function with exponential backoff
+        Retry an async function with full-jitter exponential backoff
+        
+        Each wait is drawn uniformly from [0, min(cap, delay * backoff_factor ** attempt)]
+        so concurrent callers failing together do not retry in lockstep.
         
         Returns:
             tuple: (result, error) - if successful, error is None
@@ -38,7 +45,7 @@ class RetryHandler:
                 return result, None
                 
             except Exception as e:
-                wait_time = delay * (backoff_factor ** attempt)
+                wait_time = random.uniform(0, min(cap, delay * (backoff_factor ** attempt)))
                 error = Error(
                     phase=phase_name,
                     message=str(e),
@@ -49,7 +56,7 @@ class RetryHandler:
                 
                 if attempt < max_retries:
                     logger.info(f"Waiting {wait_time:.2f}s before retry...")
-                    time.sleep(wait_time)
+                    await asyncio.sleep(wait_time)
                 else:
                     logger.error(f"Max retries ({max_retries}) reached for {phase_name}")
                     return None, error
@@ -61,10 +68,12 @@ class RetryHandler:
         delay: float = 1.0,
         backoff_factor: float = 2.0,
         phase_name: str = "unknown",
-        *args, **kwargs
+        *args,
+        cap: float = 30.0,
+        **kwargs
     ) -> tuple[Optional[T], Optional[Error]]:
         """
-        Retry a synchronous function with exponential backoff
+        Retry a synchronous function with full-jitter exponential backoff
         
         Returns:
             tuple: (result, error) - if successful, error is None
@@ -80,7 +89,7 @@ class RetryHandler:
                 return result, None
                 
             except Exception as e:
-                wait_time = delay * (backoff_factor ** attempt)
+                wait_time = random.uniform(0, min(cap, delay * (backoff_factor ** attempt)))
                 error = Error(
                     phase=phase_name,
                     message=str(e),
@@ -1,17 +1,50 @@
 # utils/state_manager.py - Modified version
-import json
+import asyncio
 import os
+import tempfile
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from models.schemas import State, Error
 
+# Process umask, read once at import (reading it means briefly setting it, which
+# is not safe from the worker threads that write state); applied to temp files
+# so checkpoints get the same permissions a plain open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """Write via a unique temp file, fsync and rename so a crash or a concurrent
+    save never leaves a partial state file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 class StateManager:
     def __init__(self, output_dir: str = "state"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
+        # Computed state paths, every checkpoint of a video reuses its path
+        self._state_paths: Dict[Tuple[str, str], str] = {}
     
     def get_state_path(self, channel_id: str, video_id: str) -> str:
-        return os.path.join(self.output_dir, f"{channel_id}_{video_id}_state.json")
+        key = (channel_id, video_id)
+        path = self._state_paths.get(key)
+        if path is None:
+            path = os.path.join(self.output_dir, f"{channel_id}_{video_id}_state.json")
+            self._state_paths[key] = path
+        return path
     
     def load_state(self, channel_id: str, video_id: str) -> Optional[State]:
         """Load state from disk if it exists"""
@@ -19,36 +52,39 @@ class StateManager:
         
         if os.path.exists(state_path):
             try:
-                with open(state_path, 'r') as f:
-                    data = json.load(f)
-                return State.model_validate(data)
+                with open(state_path, 'rb') as f:
+                    return State.model_validate_json(f.read())
             except Exception as e:
                 print(f"Error loading state: {e}")
                 return None
         
         return None
     
-    def save_state(self, state: State) -> None:
-        """Save state to disk"""
+    async def save_state(self, state: State) -> None:
+        """Save state to disk without blocking the event loop"""
         state_path = self.get_state_path(state.channel_id, state.video_id)
         
         # Update timestamp
         state.timestamp = datetime.now().isoformat()
         
         try:
-            with open(state_path, 'w') as f:
-                f.write(state.model_dump_json(indent=2))
+            # Serialize here so the state can't change mid-dump; only the write is offloaded
+            await asyncio.to_thread(_atomic_write, state_path, state.model_dump_json().encode())
         except Exception as e:
             print(f"Error saving state: {e}")
     
+    async def flush(self, state: State) -> None:
+        """Write state at a node boundary, including errors added since the last save"""
+        await self.save_state(state)
+    
     def add_error(self, state: State, error: Error) -> State:
-        """Add error to state and update status"""
-        # Initialize errors list if it doesn't exist
-        if "errors" not in state.interim_results:
-            state.interim_results["errors"] = []
-            
-        # Add error to list
-        state.interim_results["errors"].append(error.model_dump())
+        """Add error to state and update status
+        
+        The state is not written here; workflow nodes call flush() when they
+        exit, whether they succeed or fail.
+        """
+        # Add error to list, initializing it if it doesn't exist
+        state.interim_results.setdefault("errors", []).append(error.model_dump(mode="json"))
         
         # Update completion status based on error phase
         if error.phase == "process_extraction":
@@ -59,9 +95,7 @@ class StateManager:
             state.completion_status.info_extraction = "failed"
         elif error.phase == "output_compilation":
             state.completion_status.output_compilation = "failed"
-            
-        # Save updated state
-        self.save_state(state)
+
         return state
     
     def initialize_state(self, channel_id: str, video_id: str) -> State:
@@ -1,12 +1,22 @@
 from __future__ import annotations
 from pydantic_graph import BaseNode, Graph, End, GraphRunContext
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from models.schemas import State
 from utils.state_manager import StateManager
 from agents.info_extractor import extract_info, save_extraction_results
 
+# Shared across node runs; StateManager() creates its output directory on init
+_STATE_MANAGER: Optional[StateManager] = None
+
+def get_state_manager() -> StateManager:
+    """Return the shared StateManager, creating it on first use"""
+    global _STATE_MANAGER
+    if _STATE_MANAGER is None:
+        _STATE_MANAGER = StateManager()
+    return _STATE_MANAGER
+
 @dataclass
 class YTAnalysisState:
     state: State
@@ -19,25 +29,27 @@ class ExtractInfoNode(BaseNode[YTAnalysisState, None, Dict[str, Any]]):
         state = ctx.state.state
         video_id = state.video_id
         transcript = ctx.state.youtube_data.get("transcript", [])
+        video_info = ctx.state.youtube_data.get("video_info") or {}
         video_metadata = {
-            'video': ctx.state.youtube_data.get("video_info", {}).get("video", {}),
-            'channel': ctx.state.youtube_data.get("video_info", {}).get("channel", {})
+            'video': video_info.get("video", {}),
+            'channel': video_info.get("channel", {})
         }
         
-        # Run extraction
-        results = await extract_info(transcript, video_metadata)
-        
-        # Save to output directory
-        output_path = await save_extraction_results(video_id, results)
-        
-        # Update state
-        state.interim_results["software"] = results.get("software", [])
-        state.interim_results["tags"] = results.get("tags", [])
-        state.completion_status.info_extraction = "complete"
-        
-        # Save state
-        state_manager = StateManager()
-        state_manager.save_state(state)
+        state_manager = get_state_manager()
+        try:
+            # Run extraction
+            results = await extract_info(transcript, video_metadata)
+            
+            # Save to output directory
+            output_path = await save_extraction_results(video_id, results)
+            
+            # Update state
+            state.interim_results["software"] = results.get("software", [])
+            state.interim_results["tags"] = results.get("tags", [])
+            state.completion_status.info_extraction = "complete"
+        finally:
+            # Persist state (and any errors recorded with add_error) even if the node fails
+            await state_manager.flush(state)
         
         return End(results)
 